@@ -1,12 +1,23 @@
 # coding: utf-8
 
+import os
 import sys
-from random import sample
-from time import time
+from multiprocessing import Pool, shared_memory
+from time import perf_counter_ns
 import matplotlib.pyplot as plt
+import numpy as np
 from tsr import double_tree_algorithm, christofides_algorithm
 
 
+# シャッフルしたインデックスの順列の生成に用いる乱数生成器
+_rng = np.random.default_rng()
+
+
+# ワーカープロセスが_init_workerでセットし、_one_trialで参照するグローバル変数
+_workerShm = None
+_workerCostMatrix = None
+
+
 def run_two_algorithms(costMatrix: list, start: int, times: int):
     """
     完全グラフのコスト行列の行と列のインデックスをシャッフルして、
@@ -37,80 +48,106 @@ def run_two_algorithms(costMatrix: list, start: int, times: int):
         Christofidesのアルゴリズムの実行時間(ms)のリスト
     """
 
-    # 返却値の初期化
-    doubleTreeRoutes = []
-    doubleTreeCosts = []
-    doubleTreeTimes = []
-    christofidesRoutes = []
-    christofidesCosts = []
-    christofidesTimes = []
-
-    for _ in range(times):
-        # コスト行列の行と列のインデックスをシャッフル
-        shuffledCostMatrix, shuffledIndices = _shuffle_cost_matrix(costMatrix)
-        # シャッフルしたスタート地点を保持
-        shuffledStart = shuffledIndices.index(start)
-
-        # 2重木アルゴリズムを実行し、実行時間を観測
-        ready = time()
-        doubleTreeShuffledRoute = double_tree_algorithm(shuffledCostMatrix, shuffledStart)
-        finish = time()
-        # 2重木アルゴリズムで出力された近似巡回ルートを格納
-        doubleTreeRoute = [shuffledIndices[i] for i in doubleTreeShuffledRoute]
-        doubleTreeRoutes.append(doubleTreeRoute)
-        # 上記近似巡回ルートの合計コストを格納
-        doubleTreeCost = _calc_total_cost(doubleTreeShuffledRoute, shuffledCostMatrix)
-        doubleTreeCosts.append(doubleTreeCost)
-        # 2重木アルゴリズムの実行時間を格納
-        doubleTreeTimes.append((finish - ready) * 1000)
-
-        # Christofidesのアルゴリズムを実行し、実行時間を観測
-        ready = time()
-        christofidesShuffledRoute = christofides_algorithm(shuffledCostMatrix, shuffledStart)
-        finish = time()
-        # Christofidesのアルゴリズムで出力された近似巡回ルートを格納
-        christofidesRoute = [shuffledIndices[i] for i in christofidesShuffledRoute]
-        christofidesRoutes.append(christofidesRoute)
-        # 上記近似巡回ルートの合計コストを格納
-        christofidesCost = _calc_total_cost(christofidesShuffledRoute, shuffledCostMatrix)
-        christofidesCosts.append(christofidesCost)
-        # Christofidesのアルゴリズムの実行時間を格納
-        christofidesTimes.append((finish - ready) * 1000)
-    
+    # コスト行列は全イテレーションで共通のため、ループ前に1度だけndarrayに変換
+    cost_np = np.asarray(costMatrix, dtype=np.float64)
+
+    # 全試行分のシャッフルしたインデックスの順列を1度のNumPy呼び出しで一括生成
+    perms = _rng.permuted(np.tile(np.arange(len(cost_np)), (times, 1)), axis=1)
+    # 全試行分の逆順列を一括計算し、シャッフルしたスタート地点を先に求める
+    shuffledStarts = np.argsort(perms, axis=1)[:, start]
+
+    # コスト行列を共有メモリに載せて、各試行をプロセスプールで並列実行
+    shm = shared_memory.SharedMemory(create=True, size=cost_np.nbytes)
+    try:
+        sharedCostMatrix = np.ndarray(cost_np.shape, dtype=np.float64, buffer=shm.buf)
+        sharedCostMatrix[:] = cost_np
+        with Pool(
+            processes=os.cpu_count(),
+            initializer=_init_worker,
+            initargs=(shm.name, cost_np.shape),
+        ) as pool:
+            results = pool.starmap(_one_trial, zip(perms, shuffledStarts.tolist()))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    # 各試行の結果を6つのリストに分解して返却
+    doubleTreeRoutes = [result[0] for result in results]
+    doubleTreeCosts = [result[1] for result in results]
+    doubleTreeTimes = [result[2] for result in results]
+    christofidesRoutes = [result[3] for result in results]
+    christofidesCosts = [result[4] for result in results]
+    christofidesTimes = [result[5] for result in results]
+
     return doubleTreeRoutes, doubleTreeCosts, doubleTreeTimes, christofidesRoutes, christofidesCosts, christofidesTimes
 
 
-def _shuffle_cost_matrix(costMatrix: list):
+def _init_worker(shmName: str, shape: tuple):
     """
-    コスト行列の行と列のインデックスをシャッフルする
+    ワーカープロセスの初期化時に、共有メモリ上のコスト行列を保持する
 
     Parameters
     ----------
-    costMatrix : list
-        完全グラフのコスト行列
-    
+    shmName : str
+        コスト行列を格納した共有メモリの名前
+    shape : tuple
+        コスト行列の形状
+    """
+
+    global _workerShm, _workerCostMatrix
+    _workerShm = shared_memory.SharedMemory(name=shmName)
+    _workerCostMatrix = np.ndarray(shape, dtype=np.float64, buffer=_workerShm.buf)
+
+
+def _one_trial(shuffledIndices: np.ndarray, shuffledStart: int):
+    """
+    コスト行列をシャッフルして2つのアルゴリズムを1回ずつ実行する
+
+    Parameters
+    ----------
+    shuffledIndices : numpy.ndarray
+        シャッフルしたインデックスの順列
+    shuffledStart : int
+        シャッフルしたスタート地点
+
     Returns
     -------
-    shuffledCostMatrix : list
-        シャッフルした完全グラフのコスト行列
-    shuffledStart : int
-        シャッフルしたインデックス
+    doubleTreeRoute : list
+        2重木アルゴリズムで出力された近似巡回ルート
+    doubleTreeCost : double
+        上記近似巡回ルートの合計コスト
+    doubleTreeTime : double
+        2重木アルゴリズムの実行時間(ms)
+    christofidesRoute : list
+        Christofidesのアルゴリズムで出力された近似巡回ルート
+    christofidesCost : double
+        上記近似巡回ルートの合計コスト
+    christofidesTime : double
+        Christofidesのアルゴリズムの実行時間(ms)
     """
 
-    # 元のインデックスリストを生成
-    indices = range(len(costMatrix))
-    # 元のインデックスリストをシャッフルして生成
-    shuffledIndices = sample(indices, len(indices))
-
-    # シャッフルした完全グラフのコスト行列を初期化し、1行ずつ格納
-    shuffledCostMatrix = []
-    for i in indices:
-        tmpShuffledCostMatrix = []
-        for j in indices:
-            tmpShuffledCostMatrix.append(costMatrix[shuffledIndices[i]][shuffledIndices[j]])
-        shuffledCostMatrix.append(tmpShuffledCostMatrix)
-    
-    return shuffledCostMatrix, shuffledIndices
+    # 事前生成された順列でコスト行列の行と列を一括シャッフル
+    shuffledCostMatrix = _workerCostMatrix[np.ix_(shuffledIndices, shuffledIndices)]
+
+    # 2重木アルゴリズムを実行し、実行時間をナノ秒精度で観測
+    ready = perf_counter_ns()
+    doubleTreeShuffledRoute = double_tree_algorithm(shuffledCostMatrix, shuffledStart)
+    finish = perf_counter_ns()
+    # 2重木アルゴリズムで出力された近似巡回ルートと合計コスト・実行時間を保持
+    doubleTreeRoute = [int(shuffledIndices[i]) for i in doubleTreeShuffledRoute]
+    doubleTreeCost = _calc_total_cost(doubleTreeShuffledRoute, shuffledCostMatrix)
+    doubleTreeTime = (finish - ready) / 1e6
+
+    # Christofidesのアルゴリズムを実行し、実行時間をナノ秒精度で観測
+    ready = perf_counter_ns()
+    christofidesShuffledRoute = christofides_algorithm(shuffledCostMatrix, shuffledStart)
+    finish = perf_counter_ns()
+    # Christofidesのアルゴリズムで出力された近似巡回ルートと合計コスト・実行時間を保持
+    christofidesRoute = [int(shuffledIndices[i]) for i in christofidesShuffledRoute]
+    christofidesCost = _calc_total_cost(christofidesShuffledRoute, shuffledCostMatrix)
+    christofidesTime = (finish - ready) / 1e6
+
+    return doubleTreeRoute, doubleTreeCost, doubleTreeTime, christofidesRoute, christofidesCost, christofidesTime
 
 
 def _calc_total_cost(route: list, costMatrix: list):
@@ -121,21 +158,21 @@ def _calc_total_cost(route: list, costMatrix: list):
     ----------
     route : list
         巡回ルート
-    costMatrix : list
+    costMatrix : list or numpy.ndarray
         完全グラフのコスト行列
-    
+
     Returns
     -------
     totalCost : double
         合計コスト
     """
 
-    # 合計コストを初期化し、巡回ルートの1辺ごとに足し合わせる
-    totalCost = 0.0
-    for i in range(len(route) - 1):
-        totalCost += costMatrix[route[i]][route[i + 1]]
+    # コスト行列と巡回ルートをndarrayに変換(リストで渡された場合も受け付ける)
+    cost_np = np.asarray(costMatrix, dtype=np.float64)
+    route_arr = np.asarray(route, dtype=np.intp)
 
-    return totalCost
+    # 巡回ルートの全辺のコストを一括で取り出して合計
+    return float(cost_np[route_arr[:-1], route_arr[1:]].sum())
 
 
 if __name__ == "__main__":
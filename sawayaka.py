@@ -2,6 +2,7 @@
 
 from datetime import datetime
 import folium as flm
+import numpy as np
 from googlemaps import Client
 
 
@@ -11,9 +12,18 @@ class Sawayaka(object):
 
     Attributes
     ----------
-    _directions : list
-        各店舗間の経路情報の行列
+    _client : googlemaps.Client
+        Google Mapsクライエント
+    _durations : list
+        各店舗間の移動時間(単位:秒)の行列
         対角成分はNoneとする
+    _costMatrix : numpy.ndarray
+        各店舗間の移動時間(単位:秒)で表わされたコスト行列
+        対角成分は0とする
+    _directionsCache : dict
+        店舗のインデックスの組をキーとした、各店舗間の経路情報のキャッシュ
+    _polylines : dict
+        店舗のインデックスの組をキーとした、各店舗間のルートの曲がり角の位置配列のキャッシュ
     """
 
     # 各店舗の住所
@@ -58,6 +68,10 @@ class Sawayaka(object):
     _LINE_COLORS = ["red", "orange", "yellow", "green", "cyan", "blue", "purple"]
 
 
+    # Distance Matrix APIに1回で渡す出発地・目的地の最大件数(APIの上限は25件)
+    _BATCH_SIZE = 17
+
+
     def __init__(self, apiKey: str):
         """
         コンストラクタ
@@ -69,38 +83,87 @@ class Sawayaka(object):
 
         Notes
         -----
-        (32 + 31 + ... + 2 + 1)回Google Maps APIを実行して通信を行う
+        Distance Matrix APIをバッチで実行するため、店舗を17件ずつに分割した
+        組み合わせごとの計4回のみGoogle Maps APIを実行して通信を行う
         """
 
-        # 各店舗間の経路情報の行列の初期化
-        self._directions = []
-
         # Google Mapsクライエントの初期化
-        client = Client(key=apiKey)
-
-        # Google Maps APIを用いて、各店舗間の経路情報の行列をセット
-        for i in range(len(Sawayaka._ADDRESSES)):
-            directions_tmp = []
-
-            for j in range(len(Sawayaka._ADDRESSES)):
-                if i < j:
-                    # 上三角成分の場合は、Google Maps APIを実行して追加
-                    result = client.directions(
-                                origin=Sawayaka._ADDRESSES[i],
-                                destination=Sawayaka._ADDRESSES[j],
-                                mode="driving",
-                                alternatives=False
-                            )
-                    directions_tmp.append(result[0]['legs'][0])
-                elif i > j:
-                    # 下三角成分の場合は、上三角成分をそのままコピー
-                    directions_tmp.append(self._directions[j][i])
-                else:
-                    # 対角成分の場合は、Noneを追加
-                    directions_tmp.append(None)
-            
-            self._directions.append(directions_tmp)
-    
+        self._client = Client(key=apiKey)
+
+        # 各店舗間の移動時間の行列の初期化
+        count = len(Sawayaka._ADDRESSES)
+        self._durations = [[None] * count for _ in range(count)]
+
+        # 店舗を_BATCH_SIZE件ずつに分割し、Distance Matrix APIで各店舗間の移動時間を一括取得
+        batches = [
+            list(range(head, min(head + Sawayaka._BATCH_SIZE, count)))
+            for head in range(0, count, Sawayaka._BATCH_SIZE)
+        ]
+        for originIndices in batches:
+            for destinationIndices in batches:
+                result = self._client.distance_matrix(
+                            origins=[Sawayaka._ADDRESSES[i] for i in originIndices],
+                            destinations=[Sawayaka._ADDRESSES[j] for j in destinationIndices],
+                            mode="driving"
+                        )
+                for row, i in enumerate(originIndices):
+                    for column, j in enumerate(destinationIndices):
+                        if i != j:
+                            self._durations[i][j] = result['rows'][row]['elements'][column]['duration']['value']
+
+        # コスト行列は不変のため、ndarrayとして1度だけ構築してキャッシュ
+        self._costMatrix = np.array(
+            [[duration if duration is not None else 0 for duration in row] for row in self._durations],
+            dtype=np.int32
+        )
+
+        # 各店舗間の経路情報と曲がり角の位置配列のキャッシュの初期化
+        self._directionsCache = {}
+        self._polylines = {}
+
+
+    def _get_directions(self, i: int, j: int):
+        """
+        2店舗間の経路情報を取得する
+
+        Parameters
+        ----------
+        i : int
+            一方の店舗のインデックス
+        j : int
+            もう一方の店舗のインデックス
+
+        Returns
+        -------
+        leg : dict
+            インデックスの小さい店舗から大きい店舗への経路情報
+
+        Notes
+        -----
+        同じ店舗の組で初回のみGoogle Maps APIを実行して通信を行い、2回目以降はキャッシュを返す
+        """
+
+        # 経路情報は向きによらず共有するため、インデックスの組を昇順に揃える
+        key = (min(i, j), max(i, j))
+
+        # 未取得の店舗の組の場合のみ、Directions APIを実行してキャッシュ
+        if key not in self._directionsCache:
+            result = self._client.directions(
+                        origin=Sawayaka._ADDRESSES[key[0]],
+                        destination=Sawayaka._ADDRESSES[key[1]],
+                        mode="driving",
+                        alternatives=False
+                    )
+            leg = result[0]['legs'][0]
+            self._directionsCache[key] = leg
+            # 曲がり角の位置配列は描画の度に不変のため、取得時に1度だけ構築してキャッシュ
+            self._polylines[key] = np.array(
+                [[step['start_location']['lat'], step['start_location']['lng']] for step in leg['steps']]
+                + [[leg['end_location']['lat'], leg['end_location']['lng']]]
+            )
+
+        return self._directionsCache[key]
+
 
     def get_cost_matrix(self):
         """
@@ -108,16 +171,12 @@ class Sawayaka(object):
 
         Returns
         -------
-        costMatrix : list
+        costMatrix : numpy.ndarray
             コスト行列
-            対角成分はNoneとする
+            対角成分は0とする
         """
 
-        return  [[self._directions[i][j]['duration']['value']
-                    if self._directions[i][j] is not None
-                    else None
-                    for j in range(len(self._directions[i]))]
-                for i in range(len(self._directions))]
+        return self._costMatrix
     
 
     def draw_map(self, route: list, fileName: str):
@@ -130,30 +189,36 @@ class Sawayaka(object):
             さわやか33店舗の巡回ルート
         fileName : str
             pngファイル名(拡張子除く)
+
+        Notes
+        -----
+        巡回ルートに含まれる店舗の組のうち、未取得の組の数だけGoogle Maps APIを実行して通信を行う
         """
 
         # 静岡県を俯瞰したマップインスタンスの初期化
         foliumMap = flm.Map(location=[35.1199454,138.0443639], zoom_start=10)
 
-        # 各店舗間をマーカーでマップインスタンスに追加
-        flm.Marker([self._directions[0][1]['start_location']['lat'], self._directions[0][1]['start_location']['lng']]).add_to(foliumMap)
-        for i in range(1, len(self._directions)):
-            flm.Marker([self._directions[0][i]['end_location']['lat'], self._directions[0][i]['end_location']['lng']]).add_to(foliumMap)
+        # 巡回ルートに含まれる各店舗間の経路情報から、各店舗の位置を保持
+        storeLocations = {}
+        for i in range(len(route) - 1):
+            small, large = min(route[i], route[i + 1]), max(route[i], route[i + 1])
+            leg = self._get_directions(small, large)
+            storeLocations[small] = [leg['start_location']['lat'], leg['start_location']['lng']]
+            storeLocations[large] = [leg['end_location']['lat'], leg['end_location']['lng']]
+
+        # 各店舗をマーカーでマップインスタンスに追加
+        for store in sorted(storeLocations):
+            flm.Marker(storeLocations[store]).add_to(foliumMap)
 
         # 各店舗間のルートを線でマップインスタンスに追加
         for i in range(len(route) - 1):
-            # 出発地の店舗のインデックスを取得
-            start = route[i]
-            # 到着地の店舗のインデックスを取得
-            goal = route[i + 1]
-
-            # 各店舗間のルートにおける曲がり角の位置リストを取得
-            locations = [[step['start_location']['lat'], step['start_location']['lng']] for step in self._directions[start][goal]['steps']]
-            locations.append([self._directions[start][goal]['end_location']['lat'], self._directions[start][goal]['end_location']['lng']])
+            # 出発地・到着地の店舗の組の経路情報を取得し、キャッシュ済の曲がり角の位置配列を参照
+            self._get_directions(route[i], route[i + 1])
+            key = (min(route[i], route[i + 1]), max(route[i], route[i + 1]))
 
             # 曲がり角の位置を描いた線を追加
             color = Sawayaka._LINE_COLORS[i % len(Sawayaka._LINE_COLORS)]
-            flm.PolyLine(locations, color=color).add_to(foliumMap)
-        
+            flm.PolyLine(self._polylines[key].tolist(), color=color).add_to(foliumMap)
+
         # html形式で出力
         foliumMap.save(str(fileName) + ".html")
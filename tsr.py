@@ -1,6 +1,15 @@
 # coding: utf-8
 
 import networkx as nx
+import numpy as np
+from tsr_numba import prim_mst_dense, euler_circuit, shortcut, double_tree_route
+
+# Blossom VのPythonバインディング(任意依存)
+# インストールされていなければ、純PythonのNetworkX実装にフォールバックする
+try:
+    import blossom5
+except ImportError:
+    blossom5 = None
 
 
 def double_tree_algorithm(costMatrix: list, start: int):
@@ -9,29 +18,23 @@ def double_tree_algorithm(costMatrix: list, start: int):
 
     Parameters
     ----------
-    costMatrix : list
+    costMatrix : list or numpy.ndarray
         完全グラフのコスト行列
     start : int
         近似巡回ルートのスタート地点
-    
+
     Returns
     -------
     route : list
         近似巡回ルート
     """
 
-    # 1. コスト行列から重み付き完全グラフを生成
-    graph = _create_weighted_graph(costMatrix)
-    # 2. Primのアルゴリズムで最小全域木を生成
-    spanningTree = nx.minimum_spanning_tree(graph, algorithm="prim")
-    # 3. 最小全域木の各辺を2重化
-    duplicatedSpanningTree = _duplicate_weighted_graph(spanningTree)
-    # 4. 2重化した最小全域木からオイラー路を生成
-    eulerianPath = _create_eulerian_path(duplicatedSpanningTree, start)
-    # 5. オイラー路からハミルトン閉路を生成
-    route = _create_hamiltonian_path(eulerianPath)
-    # 6. ハミルトン閉路を出力して終了
-    return route
+    # コスト行列をndarrayに変換し、対角成分を辺として選ばれないようinfにする
+    cost = np.array(costMatrix, dtype=np.float64)
+    np.fill_diagonal(cost, np.inf)
+
+    # 最小全域木の生成からハミルトン閉路の生成までを1度のコンパイル済呼び出しで実行
+    return double_tree_route(cost, start).tolist()
 
 
 def christofides_algorithm(costMatrix: list, start: int):
@@ -40,223 +43,86 @@ def christofides_algorithm(costMatrix: list, start: int):
 
     Parameters
     ----------
-    costMatrix : list
+    costMatrix : list or numpy.ndarray
         完全グラフのコスト行列
     start : int
         近似巡回ルートのスタート地点
-    
+
     Returns
     -------
     route : list
         近似巡回ルート
     """
 
-    # 1. コスト行列から重み付き完全グラフを生成
-    graph = _create_weighted_graph(costMatrix)
-    # 2. Primのアルゴリズムで最小全域木を生成
-    spanningTree = nx.minimum_spanning_tree(graph, algorithm="prim")
-    # 3. 最小全域木から偶数次数の頂点を除去
-    removedGraph = _remove_even_degree_vertices(graph, spanningTree)
-    # 4. 除去された最小全域木から最小コストの完全マッチングによるグラフを生成
-    matchingGraph = _match_minimal_weight(removedGraph)
-    # 5. 最小全域木と完全マッチングによるグラフを合体
-    mergedGraph = _merge_two_graphs(spanningTree, matchingGraph)
-    # 6. 合体したグラフからオイラー路を生成
-    eulerianPath = _create_eulerian_path(mergedGraph, start)
-    # 7. オイラー路からハミルトン閉路を生成
-    route = _create_hamiltonian_path(eulerianPath)
+    # コスト行列をndarrayに変換し、対角成分を辺として選ばれないようinfにする
+    cost = np.array(costMatrix, dtype=np.float64)
+    np.fill_diagonal(cost, np.inf)
+
+    # 1. Primのアルゴリズムで最小全域木を生成(コンパイル済)
+    parent = prim_mst_dense(cost)
+    mstDst = np.flatnonzero(parent >= 0)
+    mstSrc = parent[mstDst]
+    # 2. 最小全域木の各頂点の次数を計算
+    mstDegrees = np.bincount(np.concatenate([mstSrc, mstDst]), minlength=cost.shape[0])
+    # 3. 最小全域木で奇数次数となる頂点を抽出し、その間のコスト行列をスライスで取り出す
+    oddVertices = np.flatnonzero(mstDegrees % 2 == 1)
+    oddCostMatrix = cost[np.ix_(oddVertices, oddVertices)]
+    # 4. 奇数次数の頂点間の最小コストの完全マッチングによるグラフを生成
+    matchingGraph = _match_minimal_weight(oddCostMatrix, oddVertices)
+    # 5. 最小全域木の辺と完全マッチングの辺を連結してオイラーグラフの辺配列を生成
+    matchingEdges = np.array(list(matchingGraph.edges()), dtype=np.int64).reshape(-1, 2)
+    eulerianSrc = np.concatenate([mstSrc, matchingEdges[:, 0]])
+    eulerianDst = np.concatenate([mstDst, matchingEdges[:, 1]])
+    # 6. オイラーグラフの辺配列からオイラー路を生成(コンパイル済)
+    eulerianPath = euler_circuit(eulerianSrc, eulerianDst, cost.shape[0], start)
+    # 7. オイラー路からハミルトン閉路を生成(コンパイル済)
+    route = shortcut(eulerianPath, cost.shape[0])
     # 8. ハミルトン閉路を出力して終了
-    return route
+    return route.tolist()
 
 
-def _create_weighted_graph(costMatrix: list):
+def _match_minimal_weight(subCostMatrix: np.ndarray, vertices: np.ndarray):
     """
-    完全グラフの合計コストで重み付けした完全グラフを生成する
+    指定した頂点集合の間の最小コストの完全マッチングを生成する
 
     Parameters
     ----------
-    costMatrix : list
-        完全グラフのコスト行列
-    
-    Returns
-    -------
-    graph : networkx.Graph
-        重み付き完全グラフ
-    """
-
-    # 重み付き完全グラフを初期化して辺を追加
-    graph = nx.Graph()
-    for i in range(len(costMatrix)):
-        for j in range(i + 1, len(costMatrix[i])):
-            graph.add_edge(i, j, weight=costMatrix[i][j])
-
-    return graph
-
-
-def _duplicate_weighted_graph(graph: nx.Graph):
-    """
-    重み付けグラフの辺を2重化する
-
-    Parameters
-    ----------
-    graph : networkx.Graph
-        重み付けグラフ
-    
-    Returns
-    -------
-    duplicatedGraph : networkx.MultiGraph
-        引数の重み付けグラフの辺を2重化した重み付けグラフ
-    """
-
-    # 重み付けグラフを初期化して引数のグラフの各辺を2重化
-    duplicatedGraph = nx.MultiGraph()
-    for v in graph:
-        for w in graph[v]:
-            duplicatedGraph.add_edge(v, w, weight=graph[v][w]["weight"])
-    
-    return duplicatedGraph
-
+    subCostMatrix : numpy.ndarray
+        指定した頂点集合の間のコスト行列のスライス
+    vertices : numpy.ndarray
+        元のグラフにおける各頂点の頂点番号の配列
 
-def _create_eulerian_path(eulerianGraph: nx.MultiGraph, start: int):
-    """
-    オイラーグラフからオイラー路を生成する
-
-    Parameters
-    ----------
-    eulerianGraph : networkx.MultiGraph
-        オイラーグラフ
-    start : int
-        オイラー路のスタート地点
-    
     Returns
     -------
-    eulerianPath : list
-        オイラー路を辿る頂点の順番のリスト
-    """
-    
-    # オイラー路の辺リストを生成
-    eulerianEdges = list(nx.eulerian_circuit(eulerianGraph, start))
-
-    # オイラー路を辿る頂点の順番のリストを生成
-    eulerianPath = [edge[0] for edge in eulerianEdges]
-    # オイラー路のスタート地点とゴール地点を一致させる
-    eulerianPath.append(eulerianEdges[len(eulerianEdges) - 1][1])
-
-    return eulerianPath
-
-
-def _create_hamiltonian_path(eulerianPath: list):
-    """
-    オイラー路からハミルトン閉路を生成する
-
-    Parameters
-    ----------
-    eulerian_path : list
-        オイラー路を辿る頂点の順番のリスト
-    
-    Returns
-    -------
-    hamiltonianPath : list
-        ハミルトン閉路を辿る頂点の順番のリスト
-    """
-
-    # ハミルトン閉路を辿る頂点の順番のリストを初期化
-    hamiltonianPath = []
-    # 既出の頂点集合を初期化
-    existedVertice = set()
-    # オイラー路を辿る各頂点を辿り、2回目以降に現れた頂点は無視する
-    for vertex in eulerianPath:
-        if vertex not in existedVertice:
-            hamiltonianPath.append(vertex)
-            existedVertice.add(vertex)
-
-    # ハミルトン閉路のスタート地点とゴール地点を一致させる
-    hamiltonianPath.append(eulerianPath[0])
-
-    return hamiltonianPath
-
-
-def _remove_even_degree_vertices(graph: nx.Graph, spanningTree: nx.Graph):
-    """
-    全域木から偶数次数の頂点をグラフから取り除いた部分ブラフを生成する
-
-    Parameters
-    ----------
-    graph : networkx.Graph
-        グラフ
-    spanningTree : networkx.Graph
-        全域木
-    
-    Returns
-    -------
-    removedGraph : networkx.Graph
-       頂点を取り除いた部分グラフ
-    """
-
-    # 引数のグラフからコピーして初期化し、全域木の偶数次数の頂点を削除
-    removedGraph = nx.Graph(graph)
-    for v in spanningTree:
-        if spanningTree.degree[v] % 2 == 0:
-            removedGraph.remove_node(v)
-    
-    return removedGraph
-
-
-def _match_minimal_weight(graph: nx.Graph):
-    """
-    グラフの最小コストの完全マッチングを生成する
-
-    Parameters
-    ----------
-    graph : networkx.Graph
-        グラフ
-    
-    Returns
-    -------
-    matchingGraph : set
+    matchingGraph : networkx.Graph
         マッチングを構成する辺(2要素のみ持つタプル)のみ持つグラフ
     """
 
-    # グラフの全コストの大小関係を反転させるため、コストの符号を逆にして初期化
-    tmpGraph = nx.Graph()
-    for edgeData in graph.edges.data():
-        tmpGraph.add_edge(edgeData[0], edgeData[1], weight=-edgeData[2]["weight"])
-    # ブロッサムアルゴリズムで最大重み最大マッチングを生成
-    matching = nx.max_weight_matching(tmpGraph, maxcardinality=True)
-
-    # マッチングを構成するのみ持つグラフの生成
+    count = len(vertices)
+    # スライス上の上三角成分から辺の端点と重みを一括で取り出す
+    a, b = np.triu_indices(count, 1)
+    w_arr = subCostMatrix[a, b]
+
+    if blossom5 is not None:
+        # C実装のBlossom Vで最小コストの完全マッチングを解く
+        edges = list(zip(a.tolist(), b.tolist(), w_arr.tolist()))
+        matching = blossom5.min_weight_perfect_matching(count, edges)
+    else:
+        # グラフの全コストの大小関係を反転させるため、最大コストから各コストを引いた重みを一括計算
+        flipped = w_arr.max() - w_arr
+        tmpGraph = nx.Graph()
+        tmpGraph.add_weighted_edges_from(zip(a.tolist(), b.tolist(), flipped.tolist()))
+        # ブロッサムアルゴリズムで最大重み最大マッチングを生成
+        matching = nx.max_weight_matching(tmpGraph, maxcardinality=True)
+
+    # マッチングを構成する辺のみ持つグラフを元の頂点番号で生成
     matchingGraph = nx.Graph()
-    for edge in matching:
-        matchingGraph.add_edge(edge[0], edge[1], weight=graph[edge[0]][edge[1]]["weight"])
+    for i, j in matching:
+        matchingGraph.add_edge(int(vertices[i]), int(vertices[j]), weight=float(subCostMatrix[i, j]))
 
     return matchingGraph
 
 
-def _merge_two_graphs(graph1: nx.Graph, graph2: nx.Graph):
-    """
-    辺が2重化されていない2つのグラフを合体する
-
-    Parameters
-    ----------
-    graph1 : networkx.Graph
-        1つ目のグラフ
-    graph2 : networkx.Graph
-        2つ目のグラフ
-    
-    Returns
-    -------
-    mergedGraph : networkx.MultiGraph
-        合体したグラフ
-    """
-
-    # 合体したグラフを1つ目のグラフからコピーして初期化し、2つ目のグラフの各辺を追加
-    mergedGraph = nx.MultiGraph(graph1)
-    for edgeData in graph2.edges.data():
-        mergedGraph.add_edge(edgeData[0], edgeData[1], weight=edgeData[2]["weight"])
-    
-    return mergedGraph
-
-
 if __name__ == "__main__":
     # 完全グラフのコスト行列
     costMatrix =    [[None,    8,   14,   17,   10,    6,   15],
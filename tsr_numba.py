@@ -0,0 +1,251 @@
+# coding: utf-8
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def prim_mst_dense(cost):
+    """
+    Primのアルゴリズムで密なコスト行列から最小全域木を生成する
+
+    Parameters
+    ----------
+    cost : numpy.ndarray
+        完全グラフのコスト行列(float64)
+        対角成分は辺として選ばれないようinfとすること
+
+    Returns
+    -------
+    parent : numpy.ndarray
+        最小全域木の各頂点の親頂点の配列(根の親は-1)
+    """
+
+    n = cost.shape[0]
+    inTree = np.zeros(n, dtype=np.bool_)
+    dist = np.full(n, np.inf)
+    parent = np.full(n, -1, dtype=np.int64)
+
+    # 頂点0を根として、木に最も近い頂点を1つずつ追加
+    dist[0] = 0.0
+    for _ in range(n):
+        u = -1
+        best = np.inf
+        for v in range(n):
+            if not inTree[v] and dist[v] < best:
+                best = dist[v]
+                u = v
+        inTree[u] = True
+        for v in range(n):
+            if not inTree[v] and cost[u, v] < dist[v]:
+                dist[v] = cost[u, v]
+                parent[v] = u
+
+    return parent
+
+
+@njit(cache=True)
+def euler_tour_from_mst(parent, start):
+    """
+    辺を2重化した最小全域木のオイラー路を生成する
+
+    2重化した木のオイラー路は、木を深さ優先で辿って
+    各辺を行き・帰りに1回ずつ通る閉路と一致する
+
+    Parameters
+    ----------
+    parent : numpy.ndarray
+        最小全域木の各頂点の親頂点の配列(根の親は-1)
+    start : int
+        オイラー路のスタート地点
+
+    Returns
+    -------
+    path : numpy.ndarray
+        オイラー路を辿る頂点の順番の配列(長さ2n-1)
+    """
+
+    n = parent.shape[0]
+
+    # 親頂点の配列から無向の隣接リストをCSR形式で構築
+    degree = np.zeros(n, dtype=np.int64)
+    for v in range(n):
+        if parent[v] >= 0:
+            degree[v] += 1
+            degree[parent[v]] += 1
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    for v in range(n):
+        indptr[v + 1] = indptr[v] + degree[v]
+    adjacency = np.empty(indptr[n], dtype=np.int64)
+    cursor = indptr[:-1].copy()
+    for v in range(n):
+        if parent[v] >= 0:
+            adjacency[cursor[v]] = parent[v]
+            cursor[v] += 1
+            adjacency[cursor[parent[v]]] = v
+            cursor[parent[v]] += 1
+
+    # スタート地点から深さ優先で辿り、頂点に入る度・戻る度に記録
+    path = np.empty(2 * n - 1, dtype=np.int64)
+    visited = np.zeros(n, dtype=np.bool_)
+    stack = np.empty(n, dtype=np.int64)
+    pointer = indptr[:-1].copy()
+    top = 0
+    stack[top] = start
+    visited[start] = True
+    path[0] = start
+    length = 1
+    while top >= 0:
+        u = stack[top]
+        advanced = False
+        while pointer[u] < indptr[u + 1]:
+            v = adjacency[pointer[u]]
+            pointer[u] += 1
+            if not visited[v]:
+                visited[v] = True
+                top += 1
+                stack[top] = v
+                path[length] = v
+                length += 1
+                advanced = True
+                break
+        if not advanced:
+            top -= 1
+            if top >= 0:
+                path[length] = stack[top]
+                length += 1
+
+    return path
+
+
+@njit(cache=True)
+def euler_circuit(src, dst, vertices, start):
+    """
+    オイラーグラフの辺配列からHierholzerのアルゴリズムでオイラー路を生成する
+
+    Parameters
+    ----------
+    src : numpy.ndarray
+        オイラーグラフの各無向辺の一方の端点の配列
+    dst : numpy.ndarray
+        オイラーグラフの各無向辺のもう一方の端点の配列
+    vertices : int
+        頂点数
+    start : int
+        オイラー路のスタート地点
+
+    Returns
+    -------
+    path : numpy.ndarray
+        オイラー路を辿る頂点の順番の配列(長さ辺数+1)
+    """
+
+    edges = src.shape[0]
+
+    # 各無向辺を双方向のアークとしてCSR形式の隣接リストに展開
+    # (同じ無向辺に由来する2本のアークは同じ辺IDを共有する)
+    degree = np.zeros(vertices, dtype=np.int64)
+    for e in range(edges):
+        degree[src[e]] += 1
+        degree[dst[e]] += 1
+    indptr = np.zeros(vertices + 1, dtype=np.int64)
+    for v in range(vertices):
+        indptr[v + 1] = indptr[v] + degree[v]
+    adjacency = np.empty(indptr[vertices], dtype=np.int64)
+    edgeIds = np.empty(indptr[vertices], dtype=np.int64)
+    cursor = indptr[:-1].copy()
+    for e in range(edges):
+        u = src[e]
+        w = dst[e]
+        adjacency[cursor[u]] = w
+        edgeIds[cursor[u]] = e
+        cursor[u] += 1
+        adjacency[cursor[w]] = u
+        edgeIds[cursor[w]] = e
+        cursor[w] += 1
+
+    # Hierholzerのアルゴリズムで、未使用の辺がある限りスタックで辿る
+    pointer = indptr[:-1].copy()
+    used = np.zeros(edges, dtype=np.bool_)
+    stack = np.empty(edges + 1, dtype=np.int64)
+    path = np.empty(edges + 1, dtype=np.int64)
+    top = 0
+    stack[0] = start
+    length = 0
+    while top >= 0:
+        u = stack[top]
+        # 使用済みの辺を読み飛ばす
+        while pointer[u] < indptr[u + 1] and used[edgeIds[pointer[u]]]:
+            pointer[u] += 1
+        if pointer[u] == indptr[u + 1]:
+            # 未使用の辺がなくなった頂点をオイラー路に確定
+            path[length] = u
+            length += 1
+            top -= 1
+        else:
+            # 未使用の辺を使用済みにして先へ進む
+            k = pointer[u]
+            used[edgeIds[k]] = True
+            pointer[u] += 1
+            top += 1
+            stack[top] = adjacency[k]
+
+    return path[:length][::-1].copy()
+
+
+@njit(cache=True)
+def shortcut(path, n):
+    """
+    オイラー路の2回目以降に現れた頂点を読み飛ばしてハミルトン閉路を生成する
+
+    Parameters
+    ----------
+    path : numpy.ndarray
+        オイラー路を辿る頂点の順番の配列
+    n : int
+        頂点数
+
+    Returns
+    -------
+    route : numpy.ndarray
+        ハミルトン閉路を辿る頂点の順番の配列(長さn+1)
+    """
+
+    seen = np.zeros(n, dtype=np.bool_)
+    route = np.empty(n + 1, dtype=np.int64)
+    length = 0
+    for i in range(path.shape[0]):
+        v = path[i]
+        if not seen[v]:
+            seen[v] = True
+            route[length] = v
+            length += 1
+
+    # ハミルトン閉路のスタート地点とゴール地点を一致させる
+    route[n] = path[0]
+
+    return route
+
+
+@njit(cache=True)
+def double_tree_route(cost, start):
+    """
+    2重木アルゴリズムの全工程を1度のコンパイル済呼び出しで実行する
+
+    Parameters
+    ----------
+    cost : numpy.ndarray
+        完全グラフのコスト行列(float64)
+        対角成分は辺として選ばれないようinfとすること
+    start : int
+        近似巡回ルートのスタート地点
+
+    Returns
+    -------
+    route : numpy.ndarray
+        近似巡回ルートを辿る頂点の順番の配列(長さn+1)
+    """
+
+    parent = prim_mst_dense(cost)
+    path = euler_tour_from_mst(parent, start)
+    return shortcut(path, cost.shape[0])